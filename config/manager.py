@@ -3,8 +3,21 @@
 
 import json
 import os
+import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Optional
+
+CONFIG_PATH = Path('config.json')
+
+def _non_negative(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+def _positive(value: Any) -> bool:
+    return _non_negative(value) and value > 0
+
+def _log_level(value: Any) -> bool:
+    # getLevelName maps known level names to their number
+    return isinstance(value, str) and isinstance(logging.getLevelName(value), int)
 
 class ConfigManager:
     """Manage application configuration"""
@@ -20,23 +33,148 @@ class ConfigManager:
         'humanize_inputs': True,
         'wallet_automation': True,
         'profiles_dir': 'profiles',
-        'extensions_dir': 'extensions'
+        'extensions_dir': 'extensions',
+        'action_timeout': 30000,
+        'navigation_timeout': 60000,
+        'action_delay_min': 0.1,
+        'action_delay_max': 2.0,
+        'log_level': 'INFO',
+        'config_reload_interval': 2,
+        'metrics_log_interval': 60,
+        'cohorts': {},
+        'resource_sample_interval': 30,
+        'bot_memory_budget_mb': 1024,
+        'fleet_memory_budget_mb': 0,
+        'profiling_enabled': False,
+        'profiling_interval_ms': 10,
+        'slow_callback_ms': 100,
+        'profiling_dir': 'profiling',
+        'startup_budget_seconds': 30
+    }
+    
+    # Keys a running engine applies in place; every other key only takes
+    # effect after a restart
+    HOT_RELOADABLE = {
+        'num_bots',
+        'cohorts',
+        'action_timeout',
+        'navigation_timeout',
+        'action_delay_min',
+        'action_delay_max',
+        'log_level',
+        'resource_sample_interval',
+        'bot_memory_budget_mb',
+        'fleet_memory_budget_mb',
+        'startup_budget_seconds',
+        'config_reload_interval',
+        'metrics_log_interval'
+    }
+    
+    # Checks for values that would break the engine; an invalid value falls
+    # back to the default on load and is ignored on reload
+    VALIDATORS = {
+        'num_bots': lambda v: _non_negative(v) and isinstance(v, int),
+        'cohorts': lambda v: isinstance(v, dict),
+        'action_timeout': _non_negative,
+        'navigation_timeout': _non_negative,
+        'action_delay_min': _non_negative,
+        'action_delay_max': _non_negative,
+        'log_level': _log_level,
+        'resource_sample_interval': _positive,
+        'bot_memory_budget_mb': _non_negative,
+        'fleet_memory_budget_mb': _non_negative,
+        'startup_budget_seconds': _positive,
+        'config_reload_interval': _positive,
+        'metrics_log_interval': _non_negative
     }
     
     @classmethod
     def load_config(cls) -> 'ConfigManager':
         """Load configuration from file or use defaults"""
-        config_path = Path('config.json')
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                config_data = {**cls.DEFAULT_CONFIG, **json.load(f)}
-        else:
-            config_data = cls.DEFAULT_CONFIG
-            
-        return cls(config_data)
+        stamp = cls._file_stamp()
+        config_data = cls._read_file()
+        for key in cls._invalid_keys(config_data):
+            logging.getLogger(__name__).warning(
+                f"Invalid value {config_data[key]!r} for '{key}', using {cls.DEFAULT_CONFIG[key]!r}"
+            )
+            config_data[key] = cls.DEFAULT_CONFIG[key]
+        return cls(config_data, stamp)
+        
+    @classmethod
+    def _invalid_keys(cls, config_data: Dict[str, Any]) -> List[str]:
+        """Get the keys whose values fail validation"""
+        return [
+            key for key, is_valid in cls.VALIDATORS.items()
+            if key in config_data and not is_valid(config_data[key])
+        ]
         
-    def __init__(self, config_data: Dict[str, Any]):
+    @classmethod
+    def _read_file(cls, required: bool = False) -> Dict[str, Any]:
+        """Read the config file merged over the defaults
+        
+        A missing file means defaults unless `required` is set, in which case
+        it raises FileNotFoundError like any other unreadable file.
+        """
+        if not required and not CONFIG_PATH.exists():
+            return dict(cls.DEFAULT_CONFIG)
+        with open(CONFIG_PATH, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{CONFIG_PATH} must hold a JSON object, not {type(data).__name__}")
+        return {**cls.DEFAULT_CONFIG, **data}
+        
+    @staticmethod
+    def _file_stamp() -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of the config file"""
+        try:
+            stat = os.stat(CONFIG_PATH)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+        
+    def __init__(self, config_data: Dict[str, Any], stamp: Optional[Tuple[int, int]] = None):
         self._data = config_data
+        self._stamp = stamp
+        
+    @classmethod
+    def is_hot_reloadable(cls, key: str) -> bool:
+        """Check whether a key can change without restarting the engine"""
+        return key in cls.HOT_RELOADABLE
+        
+    def has_changed(self) -> bool:
+        """Cheaply check whether the config file changed since it was last read"""
+        return self._file_stamp() != self._stamp
+        
+    def reload(self) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """Re-read the config file and apply the hot-reloadable changes
+        
+        Keys that need a restart and keys with invalid values keep their running
+        value. Returns the previous values of the applied keys, the changed keys
+        that need a restart and the keys that were rejected as invalid.
+        """
+        # Record the stamp first so a file that fails to parse isn't retried
+        # until it is written again. A file that is briefly missing, e.g.
+        # mid-rewrite, must not reload as defaults and reset the fleet
+        self._stamp = self._file_stamp()
+        new_data = self._read_file(required=True)
+        rejected = self._invalid_keys(new_data)
+        
+        previous = {}
+        restart_required = []
+        for key, value in new_data.items():
+            if self._data.get(key) == value or key in rejected:
+                continue
+            if self.is_hot_reloadable(key):
+                previous[key] = self._data.get(key)
+            else:
+                restart_required.append(key)
+                
+        self._data.update({key: new_data[key] for key in previous})
+        return previous, restart_required, rejected
+        
+    def restore(self, values: Dict[str, Any]):
+        """Put back values, e.g. reloaded ones the engine failed to apply"""
+        self._data.update(values)
         
     def __getattr__(self, name: str):
         if name in self._data:
@@ -53,6 +191,5 @@ class ConfigManager:
         
     def save(self):
         """Save configuration to file"""
-        config_path = Path('config.json')
-        with open(config_path, 'w') as f:
+        with open(CONFIG_PATH, 'w') as f:
             json.dump(self._data, f, indent=2)
\ No newline at end of file
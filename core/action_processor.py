@@ -1,43 +1,136 @@
 # core/action_processor.py
 """Process and execute actions across all bots"""
 
+from __future__ import annotations
+
 import asyncio
+import random
 import logging
-from typing import List, Dict, Any
-from playwright.async_api import Page
+from typing import List, Dict, Any, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
 
 from .humanizer import Humanizer
 from .wallet_handler import WalletHandler
+from .cohorts import CohortManager
+from .profiler import timed
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class ActionProcessor:
     """Process actions and execute them across all bots"""
     
-    def __init__(self, pages: List[Page], humanizer: Humanizer, wallet_handler: WalletHandler):
+    # Only the most recent of these matters, so newer ones replace pending ones
+    COALESCED_ACTIONS = ('nav', 'scroll')
+    
+    # Client-side routers follow the history API and listen for popstate
+    # (or hashchange), so this replays a captured SPA navigation
+    SPA_NAVIGATION_SCRIPT = """(url) => {
+        const oldHash = location.hash;
+        history.pushState(null, '', url);
+        window.dispatchEvent(new PopStateEvent('popstate', { state: null }));
+        if (location.hash !== oldHash) window.dispatchEvent(new HashChangeEvent('hashchange'));
+    }"""
+    
+    def __init__(self, pages: List[Page], humanizer: Humanizer, wallet_handler: WalletHandler,
+                 cohorts: CohortManager, delay_range: Tuple[float, float] = (0.1, 2.0)):
         self.pages = pages
         self.humanizer = humanizer
         self.wallet_handler = wallet_handler
+        self.cohorts = cohorts
+        self.delay_range = delay_range
         self.logger = logging.getLogger(__name__)
+        self.coalesced = 0
+        # Per bot: the latest pending action of each coalesced type, and the
+        # task applying them
+        self._pending: Dict[int, Dict[str, Dict]] = {}
+        self._drains: Dict[int, asyncio.Task] = {}
         
+    @timed
     async def process_action(self, action: Dict[str, Any]):
-        """Process a single action across all bots"""
+        """Process a single action across the source bot's cohort"""
         action_type = action.get('t')
         bot_id = action.get('botId')
         
-        self.logger.info(f"Processing {action_type} action from bot {bot_id}")
+        cohort = self.cohorts.cohort_for(bot_id)
+        if cohort is None or not cohort.accepts(bot_id):
+            if cohort is not None:
+                cohort.ignored += 1
+            self.logger.debug(f"Ignoring {action_type} action from non-leader bot {bot_id}")
+            return
+            
+        self.logger.info(f"Processing {action_type} action from bot {bot_id} in cohort '{cohort.name}'")
+        cohort.dispatched += 1
         
-        # Add random delays to simulate human timing
-        delays = [random.uniform(0.1, 2.0) for _ in self.pages]
+        targets = set(cohort.targets(bot_id))
         tasks = []
         
-        for i, page in enumerate(self.pages):
-            if i + 1 == bot_id:
-                continue  # Skip the source bot
+        for page in self.pages:
+            if getattr(page, '_bot_id', None) not in targets:
+                continue  # Skip the source bot and other cohorts
                 
-            task = self.execute_action(page, action, delays[i])
-            tasks.append(task)
+            # Add random delays to simulate human timing
+            delay = random.uniform(*self.delay_range)
             
+            if action_type in self.COALESCED_ACTIONS:
+                # Don't hold up the sender, so later scrolls/navs can supersede this one
+                self.schedule_latest(page, action, delay)
+            else:
+                tasks.append(self.execute_in_order(page, action, delay))
+                
         await asyncio.gather(*tasks, return_exceptions=True)
         
+    def schedule_latest(self, page: Page, action: Dict, delay: float):
+        """Queue a scroll or navigation, replacing the pending one of the same type"""
+        bot_id = getattr(page, '_bot_id', None)
+        action_type = action.get('t')
+        pending = self._pending.setdefault(bot_id, {})
+        
+        if action_type == 'nav' and pending.pop('scroll', None) is not None:
+            self.coalesced += 1  # Scroll position belongs to the previous route
+            
+        if action_type in pending:
+            self.coalesced += 1
+        pending[action_type] = action
+        
+        if bot_id not in self._drains:
+            self._drains[bot_id] = asyncio.create_task(self.drain_pending(page, bot_id, delay))
+            
+    async def drain_pending(self, page: Page, bot_id: int, delay: float):
+        """Apply a bot's pending navigation, then its pending scroll, until none are left"""
+        try:
+            await asyncio.sleep(delay)
+            pending = self._pending[bot_id]
+            while pending:
+                action_type = 'nav' if 'nav' in pending else 'scroll'
+                await self.execute_action(page, pending.pop(action_type), 0)
+        finally:
+            # No await between the last check and here, so nothing queued
+            # after the loop ended can be left without a drain
+            del self._drains[bot_id]
+            
+    async def execute_in_order(self, page: Page, action: Dict, delay: float):
+        """Execute an action once the bot's pending scroll/navigation has been applied"""
+        drain = self._drains.get(getattr(page, '_bot_id', None))
+        if drain is not None:
+            # Shielded so a cancelled click doesn't cancel the navigation
+            await asyncio.shield(drain)
+        await self.execute_action(page, action, delay)
+        
+    @staticmethod
+    def same_origin(url: str, other: str) -> bool:
+        """Check whether two URLs share scheme, host and port"""
+        a, b = urlsplit(url), urlsplit(other)
+        return a.scheme in ('http', 'https') and (a.scheme, a.netloc) == (b.scheme, b.netloc)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get action dispatch metrics"""
+        return {
+            'cohorts': self.cohorts.get_metrics(),
+            'coalesced': self.coalesced
+        }
+        
+    @timed
     async def execute_action(self, page: Page, action: Dict, delay: float):
         """Execute an action on a specific page"""
         await asyncio.sleep(delay)
@@ -68,8 +161,13 @@ class ActionProcessor:
                         
             elif action_type == 'nav':
                 url = action.get('href')
-                if url:
-                    await page.goto(url, wait_until='domcontentloaded')
+                if url and url != page.url:
+                    if self.same_origin(url, page.url):
+                        # Route in place like the leader's SPA did; a full
+                        # reload would throw away the follower's page state
+                        await page.evaluate(self.SPA_NAVIGATION_SCRIPT, url)
+                    else:
+                        await page.goto(url, wait_until='domcontentloaded')
                     
             elif action_type == 'scroll':
                 xn = action.get('xn', 0)
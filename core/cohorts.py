@@ -0,0 +1,119 @@
+# core/cohorts.py
+"""Group bots into independently mirrored cohorts"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+DEFAULT_COHORT = 'default'
+
+def _parse_bot_id(value: Any) -> Optional[int]:
+    """Coerce a configured bot id such as `2` or `"2"` to an int"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class Cohort:
+    """A named group of bots that mirror a single leader"""
+
+    def __init__(self, name: str, members: List[int], leader: Optional[int] = None):
+        self.name = name
+        self.members = members
+        self.leader = leader
+        self.dispatched = 0
+        self.ignored = 0
+
+    def accepts(self, bot_id: int) -> bool:
+        """Check whether actions from this bot should be mirrored"""
+        # Only the leader drives the cohort; followers replay with real input
+        # events, so mirroring their captures would echo actions back forever
+        return bot_id == self.leader and bot_id in self.members
+
+    def targets(self, bot_id: int) -> List[int]:
+        """Get the bots an action from this bot is mirrored to"""
+        return [member for member in self.members if member != bot_id]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export cohort membership and dispatch counters"""
+        return {
+            'leader': self.leader,
+            'bots': list(self.members),
+            'dispatched': self.dispatched,
+            'ignored': self.ignored
+        }
+
+class CohortManager:
+    """Resolve bots to cohorts from the `cohorts` configuration
+
+    The configuration maps a cohort name to either a list of bot ids (the
+    first one leads) or a dict with `bots` and an optional `leader` (the
+    lowest member by default). Bot ids are 1-based like `page._bot_id`. Bots
+    not listed anywhere fall into the `default` cohort, led by its lowest bot.
+    """
+
+    def __init__(self, cohorts_config: Dict[str, Any], num_bots: int,
+                 previous: Optional['CohortManager'] = None):
+        self.logger = logging.getLogger(__name__)
+        self.cohorts: Dict[str, Cohort] = {}
+        self._by_bot: Dict[int, Cohort] = {}
+
+        for name, spec in (cohorts_config or {}).items():
+            if isinstance(spec, dict):
+                bots = spec.get('bots', [])
+                leader = spec.get('leader')
+            else:
+                bots = spec
+                leader = bots[0] if isinstance(bots, list) and bots else None
+            if not isinstance(bots, list):
+                self.logger.warning(f"Cohort '{name}': expected a list of bots, skipping")
+                continue
+
+            # An unparseable leader is kept as-is and disables the cohort below
+            if leader is not None and _parse_bot_id(leader) is not None:
+                leader = _parse_bot_id(leader)
+
+            cohort = Cohort(name, [], leader)
+            for value in bots:
+                bot_id = _parse_bot_id(value)
+                if bot_id is None or not 1 <= bot_id <= num_bots:
+                    self.logger.warning(f"Cohort '{name}': bot {value!r} does not exist, skipping")
+                    continue
+                if bot_id in self._by_bot:
+                    self.logger.warning(
+                        f"Cohort '{name}': bot {bot_id} already belongs to '{self._by_bot[bot_id].name}', skipping"
+                    )
+                    continue
+                cohort.members.append(bot_id)
+                self._by_bot[bot_id] = cohort
+
+            if leader is None and cohort.members:
+                cohort.leader = min(cohort.members)
+            elif leader is not None and leader not in cohort.members:
+                self.logger.warning(f"Cohort '{name}': leader {leader} is not a member, cohort disabled")
+            self.cohorts[name] = cohort
+
+        unassigned = [bot_id for bot_id in range(1, num_bots + 1) if bot_id not in self._by_bot]
+        if unassigned:
+            default = self.cohorts.setdefault(DEFAULT_COHORT, Cohort(DEFAULT_COHORT, []))
+            for bot_id in unassigned:
+                default.members.append(bot_id)
+                self._by_bot[bot_id] = default
+            if default.leader is None:
+                default.leader = min(default.members)
+
+        # Keep dispatch counters of cohorts that survive a rebuild
+        if previous is not None:
+            for name, cohort in self.cohorts.items():
+                if name in previous.cohorts:
+                    cohort.dispatched = previous.cohorts[name].dispatched
+                    cohort.ignored = previous.cohorts[name].ignored
+
+    def cohort_for(self, bot_id: int) -> Optional[Cohort]:
+        """Get the cohort a bot belongs to"""
+        return self._by_bot.get(bot_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get membership and dispatch counters for every cohort"""
+        return {name: cohort.to_dict() for name, cohort in self.cohorts.items()}
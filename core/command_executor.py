@@ -1,14 +1,18 @@
 # core/command_executor.py
 """Execute commands with human-like behavior"""
 
+from __future__ import annotations
+
 import asyncio
 import random
 import logging
-from typing import Dict, List
-from playwright.async_api import Page
+from typing import Dict, List, TYPE_CHECKING
 
 from .humanizer import Humanizer
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 class CommandExecutor:
     """Execute commands with human-like behavior"""
     
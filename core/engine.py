@@ -1,26 +1,49 @@
 # core/engine.py
-import asyncio
+from __future__ import annotations
+
 import json
+import asyncio
 import random
+import signal
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 
-from playwright.async_api import async_playwright, Page, BrowserContext
 from .stealth import stealth_async
 from .humanizer import Humanizer
 from .wallet_handler import WalletHandler
+from .resource_monitor import ResourceMonitor
+from .profiler import Profiler
+from .startup import StartupReport
+from .cohorts import CohortManager
+from .transport import INTERN_LIMIT
+
+# Floor for config_reload_interval so polling never becomes a busy loop
+MIN_CONFIG_RELOAD_INTERVAL = 0.5
+
+# Launch attempts before a recycled bot is given up for lost
+RECYCLE_ATTEMPTS = 2
+
+# Playwright is only imported once the engine actually starts
+if TYPE_CHECKING:
+    from playwright.async_api import Page, BrowserContext
 
 class AutomationEngine:
     """Enhanced automation engine with stealth and humanization"""
     
-    def __init__(self):
+    def __init__(self, startup: Optional[StartupReport] = None):
         self.logger = logging.getLogger(__name__)
         self.pages: List[Page] = []
         self.contexts: List[BrowserContext] = []
         self.playwright = None
         self.humanizer = Humanizer()
         self.wallet_handler = WalletHandler()
+        self.resource_monitor = ResourceMonitor(self)
+        self.profiler: Optional[Profiler] = None
+        self.startup = startup or StartupReport()
+        # Held while bots are added, closed or relaunched, since the config
+        # watcher and the resource monitor both change the fleet
+        self.fleet_lock = asyncio.Lock()
         self.is_running = True
         
     async def start(self):
@@ -28,37 +51,114 @@ class AutomationEngine:
         self.logger.info("Starting enhanced Chrommin engine...")
         
         # Load configuration
-        from config.manager import ConfigManager
-        self.config = ConfigManager.load_config()
+        with self.startup.phase('load config'):
+            from config.manager import ConfigManager
+            self.config = ConfigManager.load_config()
+            
+        logging.getLogger().setLevel(self.config.log_level)
         
-        # Initialize playwright
-        self.playwright = await async_playwright().start()
+        if self.config.profiling_enabled:
+            self.start_profiler()
+            
+        try:
+            # Initialize playwright
+            with self.startup.phase('import playwright'):
+                from playwright.async_api import async_playwright
+            with self.startup.phase('start playwright'):
+                self.playwright = await async_playwright().start()
+                
+            # Create bot profiles
+            await self.create_bots()
+            
+            # Start WebSocket server
+            with self.startup.phase('start websocket server'):
+                await self.start_websocket_server()
+                
+            if not self.startup.within_budget(self.config.startup_budget_seconds):
+                self.logger.warning(
+                    f"No bot was ready within the {self.config.startup_budget_seconds}s startup budget"
+                )
+                
+            # Watch per-bot memory and recycle bots over budget
+            self.monitor_task = asyncio.create_task(self.resource_monitor.run())
+            
+            # Apply config.json edits without a restart where possible
+            self.config_task = asyncio.create_task(self.watch_config())
+            
+            # Periodically log fleet metrics
+            self.metrics_task = asyncio.create_task(self.log_metrics())
+            
+            # Main loop
+            while self.is_running:
+                await asyncio.sleep(1)
+        finally:
+            # Also reached on Ctrl+C, which cancels this coroutine
+            if self.profiler:
+                self.profiler.dump()
+                self.profiler.stop()
+                
+    def start_profiler(self):
+        """Start profiling, with SIGUSR1 writing a snapshot where supported"""
+        loop = asyncio.get_running_loop()
+        self.profiler = Profiler(
+            self.config.profiling_dir,
+            self.config.profiling_interval_ms,
+            self.config.slow_callback_ms
+        )
+        self.profiler.start(loop)
         
-        # Create bot profiles
-        await self.create_bots()
+        if hasattr(signal, 'SIGUSR1'):
+            try:
+                loop.add_signal_handler(signal.SIGUSR1, self.dump_profile)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not on the main thread, e.g. started from the GUI
+                
+    async def run_startup_report(self) -> bool:
+        """Start once, print the startup breakdown and shut down
         
-        # Start WebSocket server
-        await self.start_websocket_server()
+        Returns whether the first bot was ready within the startup budget.
+        """
+        # Makes start() return as soon as everything is up
+        self.is_running = False
+        try:
+            await self.start()
+        finally:
+            await self.stop()
+            
+        budget = self.config.startup_budget_seconds
+        print(self.startup.format(budget))
+        return self.startup.within_budget(budget)
         
-        # Main loop
-        while self.is_running:
-            await asyncio.sleep(1)
+    def dump_profile(self) -> Optional[Path]:
+        """Write the profile collected so far, if profiling is enabled"""
+        if self.profiler:
+            return self.profiler.dump()
+        return None
             
     async def create_bots(self):
         """Create and configure bot instances"""
         self.logger.info(f"Creating {self.config.num_bots} bot instances...")
         
         for i in range(self.config.num_bots):
-            try:
-                context = await self.create_bot_context(i)
-                page = await self.setup_bot_page(context, i)
-                self.contexts.append(context)
-                self.pages.append(page)
-                self.logger.info(f"Bot {i+1} ready")
-                
-            except Exception as e:
-                self.logger.error(f"Failed to create bot {i+1}: {e}")
+            with self.startup.phase(f'launch bot {i+1}'):
+                ready = await self.launch_bot(i)
+            if ready:
+                self.startup.mark_ready()
                 
+    async def launch_bot(self, bot_id: int) -> bool:
+        """Launch a single bot and add it to the fleet"""
+        try:
+            context = await self.create_bot_context(bot_id)
+            page = await self.setup_bot_page(context, bot_id)
+            self.contexts.append(context)
+            self.pages.append(page)
+            self.logger.info(f"Bot {bot_id+1} ready")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to create bot {bot_id+1}: {e}")
+            return False
+            
     async def create_bot_context(self, bot_id: int) -> BrowserContext:
         """Create a browser context for a bot"""
         browser_args = await self.generate_browser_args(bot_id)
@@ -70,6 +170,8 @@ class AutomationEngine:
             args=browser_args,
             ignore_default_args=["--enable-automation"]
         )
+        context.set_default_timeout(self.config.action_timeout)
+        context.set_default_navigation_timeout(self.config.navigation_timeout)
         
         # Apply stealth enhancements
         await stealth_async(context)
@@ -93,6 +195,11 @@ class AutomationEngine:
             if ext_paths:
                 args.append(f"--load-extension={','.join(ext_paths)}")
                 
+        # Hard V8 heap ceiling well above the recycling budget, so a runaway
+        # page crashes its own renderer instead of pushing the host into swap
+        if self.config.bot_memory_budget_mb:
+            args.append(f"--js-flags=--max-old-space-size={self.config.bot_memory_budget_mb * 2}")
+            
         return args
         
     async def setup_bot_page(self, context: BrowserContext, bot_id: int) -> Page:
@@ -102,6 +209,7 @@ class AutomationEngine:
         
         # Inject enhanced action capture script
         await page.add_init_script(self.get_action_capture_script(bot_id))
+        self.resource_monitor.watch(page)
         
         # Connect to WebSocket
         await page.evaluate(f"""
@@ -119,19 +227,114 @@ class AutomationEngine:
             if (window.chromminCaptured) return;
             window.chromminCaptured = true;
             
-            const captureAction = (type, data) => {{
-                if (window.chromminWS && window.chromminWS.readyState === WebSocket.OPEN) {{
-                    const payload = {{
-                        t: type, 
-                        ...data, 
-                        ts: Date.now(), 
-                        botId: window.chromminBotId,
-                        intent: data.intent || type
-                    }};
-                    window.chromminWS.send(JSON.stringify(payload));
+            window.chromminBotId = window.chromminBotId || {bot_id + 1};
+            const wsUrl = 'ws://{self.config.ws_host}:{self.config.ws_port}';
+            const MAX_QUEUED = 256;
+            const MAX_INTERNED = {INTERN_LIMIT};
+            
+            // Events are buffered and flushed as one batch per animation frame.
+            // Repeated strings (selectors, element text) are interned per socket
+            // and only sent the first time they are seen.
+            const queue = [];
+            let flushScheduled = false;
+            let tableSocket = null;
+            let strings = new Map();
+            let selectorLists = new Map();
+            
+            const getSocket = () => {{
+                const ws = window.chromminWS;
+                if (!ws || ws.readyState === WebSocket.CLOSING || ws.readyState === WebSocket.CLOSED) {{
+                    window.chromminWS = new WebSocket(wsUrl);
+                }}
+                return window.chromminWS;
+            }};
+            
+            const intern = (str, batch) => {{
+                let idx = strings.get(str);
+                if (idx === undefined) {{
+                    idx = strings.size;
+                    strings.set(str, idx);
+                    batch.s.push(str);
+                }}
+                return idx;
+            }};
+            
+            const internSelectors = (selectors, batch) => {{
+                const ids = selectors.map(s => intern(s, batch));
+                const key = ids.join(',');
+                let idx = selectorLists.get(key);
+                if (idx === undefined) {{
+                    idx = selectorLists.size;
+                    selectorLists.set(key, idx);
+                    batch.l.push(ids);
+                }}
+                return idx;
+            }};
+            
+            const flush = () => {{
+                flushScheduled = false;
+                if (!queue.length) return;
+                const ws = getSocket();
+                if (ws.readyState !== WebSocket.OPEN) {{
+                    ws.addEventListener('open', scheduleFlush, {{ once: true }});
+                    return;
+                }}
+                if (ws !== tableSocket) {{
+                    // The engine keeps one intern table per connection
+                    tableSocket = ws;
+                    strings = new Map();
+                    selectorLists = new Map();
+                }}
+                
+                const baseTs = queue[0].ts;
+                const batch = {{ b: window.chromminBotId, ts: baseTs, s: [], l: [], e: [] }};
+                if (strings.size >= MAX_INTERNED || selectorLists.size >= MAX_INTERNED) {{
+                    // Start over instead of growing forever; the engine resets too
+                    strings = new Map();
+                    selectorLists = new Map();
+                    batch.r = 1;
+                }}
+                for (const {{ type, data, ts }} of queue.splice(0)) {{
+                    const {{ selectors, text, intent, ...rest }} = data;
+                    const event = {{ t: type, dt: ts - baseTs, ...rest }};
+                    if (selectors) event.sl = internSelectors(selectors, batch);
+                    if (text) event.tx = intern(text, batch);
+                    if (intent && intent !== type) event.intent = intent;
+                    batch.e.push(event);
+                }}
+                if (!batch.s.length) delete batch.s;
+                if (!batch.l.length) delete batch.l;
+                ws.send(JSON.stringify(batch));
+            }};
+            
+            const scheduleFlush = () => {{
+                if (flushScheduled) return;
+                flushScheduled = true;
+                // rAF is paused for hidden documents
+                if (document.hidden) setTimeout(flush, 16);
+                else requestAnimationFrame(flush);
+            }};
+            
+            const captureAction = (type, data, target) => {{
+                const last = queue[queue.length - 1];
+                // Only the latest value matters for back-to-back inputs to one
+                // field or back-to-back scrolls/navs; anything queued in between
+                // keeps its place so followers see the same order
+                const mergeable = type === 'input' ? last && last.target === target
+                    : type === 'scroll' || type === 'nav';
+                if (mergeable && last && last.type === type) {{
+                    last.data = data;
+                    last.ts = Date.now();
+                }} else {{
+                    if (queue.length >= MAX_QUEUED) queue.shift();
+                    queue.push({{ type, data, ts: Date.now(), target }});
                 }}
+                scheduleFlush();
             }};
             
+            // Send whatever is buffered before the document goes away
+            window.addEventListener('pagehide', flush);
+            
             // Enhanced selector generation with intent detection
             const generateSelectorsWithIntent = (el) => {{
                 const selectors = [];
@@ -188,7 +391,7 @@ class AutomationEngine:
                     tag: e.target.tagName.toLowerCase(),
                     text: (e.target.textContent || '').trim().substring(0, 100),
                     intent: intent
-                }});
+                }}, e.target);
             }}, true);
             
             // Additional event listeners for input, change, etc.
@@ -201,10 +404,43 @@ class AutomationEngine:
                         tag: e.target.tagName.toLowerCase(),
                         type: e.target.getAttribute('type') || 'text',
                         intent: intent
-                    }});
+                    }}, e.target);
                 }}
             }}, true);
             
+            // SPA navigation through the history API, popstate and hash changes
+            let lastHref = location.href;
+            const captureNavigation = () => {{
+                if (location.href === lastHref) return;
+                lastHref = location.href;
+                captureAction('nav', {{ href: location.href }});
+            }};
+            ['pushState', 'replaceState'].forEach(method => {{
+                const original = history[method];
+                history[method] = function(...args) {{
+                    const result = original.apply(this, args);
+                    captureNavigation();
+                    return result;
+                }};
+            }});
+            window.addEventListener('popstate', captureNavigation);
+            window.addEventListener('hashchange', captureNavigation);
+            
+            // Scroll position sampled at most once per frame, relative to page size
+            let scrollPending = false;
+            window.addEventListener('scroll', () => {{
+                if (scrollPending) return;
+                scrollPending = true;
+                requestAnimationFrame(() => {{
+                    scrollPending = false;
+                    const body = document.body;
+                    captureAction('scroll', {{
+                        xn: body && body.scrollWidth ? window.scrollX / body.scrollWidth : 0,
+                        yn: body && body.scrollHeight ? window.scrollY / body.scrollHeight : 0
+                    }});
+                }});
+            }}, {{ passive: true }});
+            
             // Wallet and popup detection
             const originalOpen = window.open;
             window.open = function(...args) {{
@@ -219,15 +455,29 @@ class AutomationEngine:
         """Start WebSocket server for action mirroring"""
         import websockets
         from .action_processor import ActionProcessor
+        from .transport import BatchDecoder, TransportStats
         
-        self.action_processor = ActionProcessor(self.pages, self.humanizer, self.wallet_handler)
+        self.action_processor = ActionProcessor(
+            self.pages, self.humanizer, self.wallet_handler, self.build_cohorts(), self.get_delay_range()
+        )
+        self.transport_stats = TransportStats()
         
         async def handler(websocket):
             self.logger.info("Client connected to WebSocket")
+            decoder = BatchDecoder(self.transport_stats)
+            # Browsers always send an Origin; local tools don't. Pages the bots
+            # have loaded must not be able to read the fleet's URLs and layout
+            is_local_tool = self.get_ws_origin(websocket) is None
             async for message in websocket:
                 try:
-                    action = json.loads(message)
-                    await self.action_processor.process_action(action)
+                    for action in decoder.decode(message):
+                        if action.get('t') == 'metrics':
+                            if is_local_tool:
+                                await websocket.send(json.dumps(self.get_metrics()))
+                            else:
+                                self.logger.warning("Refused metrics query from a browser origin")
+                        else:
+                            await self.action_processor.process_action(action)
                 except Exception as e:
                     self.logger.error(f"Error processing action: {e}")
                     
@@ -236,15 +486,191 @@ class AutomationEngine:
         )
         self.logger.info(f"WebSocket server started on ws://{self.config.ws_host}:{self.config.ws_port}")
         
+    def build_cohorts(self) -> CohortManager:
+        """Build the cohort layout from the current configuration"""
+        previous = self.action_processor.cohorts if hasattr(self, 'action_processor') else None
+        cohorts = CohortManager(self.config.cohorts, self.config.num_bots, previous)
+        for name, cohort in cohorts.cohorts.items():
+            self.logger.info(f"Cohort '{name}': bots {cohort.members}, leader {cohort.leader}")
+        return cohorts
+        
+    def get_delay_range(self) -> Tuple[float, float]:
+        """Get the random delay range applied before mirrored actions"""
+        return self.config.action_delay_min, self.config.action_delay_max
+        
+    async def watch_config(self):
+        """Poll config.json and apply changes while the engine runs"""
+        while self.is_running:
+            await asyncio.sleep(max(self.config.config_reload_interval, MIN_CONFIG_RELOAD_INTERVAL))
+            if not self.config.has_changed():
+                continue
+                
+            try:
+                previous, restart_required, rejected = self.config.reload()
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable config.json: {e}")
+                continue
+                
+            if rejected:
+                self.logger.warning(f"Ignoring invalid config values: {', '.join(rejected)}")
+            if restart_required:
+                self.logger.warning(f"Restart required for config changes: {', '.join(restart_required)}")
+            if previous:
+                self.logger.info(f"Applying config changes: {', '.join(previous)}")
+                await self.apply_config_changes(previous)
+                
+    async def apply_config_changes(self, previous: Dict[str, Any]):
+        """Apply hot-reloaded configuration to the running fleet
+        
+        `previous` maps each changed key to its old value. When applying a
+        group of keys fails, those keys are rolled back to their old values.
+        """
+        steps = [
+            (('log_level',), self.apply_log_level),
+            (('action_timeout', 'navigation_timeout'), self.apply_timeouts),
+            (('action_delay_min', 'action_delay_max'), self.apply_delays),
+            (('num_bots', 'cohorts'), self.apply_fleet_layout)
+        ]
+        for keys, apply in steps:
+            changed = {key: previous[key] for key in keys if key in previous}
+            if not changed:
+                continue
+            try:
+                await apply(changed)
+            except Exception as e:
+                self.config.restore(changed)
+                self.logger.error(f"Failed to apply {', '.join(changed)}, keeping previous values: {e}")
+                
+        # Resource budgets, the sample interval and the metrics and reload
+        # intervals are read on every pass, so they need no action here
+        
+    async def apply_log_level(self, changed: Dict[str, Any]):
+        """Apply a reloaded log level"""
+        logging.getLogger().setLevel(self.config.log_level)
+        
+    async def apply_timeouts(self, changed: Dict[str, Any]):
+        """Apply reloaded timeouts to every bot"""
+        for context in self.contexts:
+            context.set_default_timeout(self.config.action_timeout)
+            context.set_default_navigation_timeout(self.config.navigation_timeout)
+            
+    async def apply_delays(self, changed: Dict[str, Any]):
+        """Apply a reloaded action delay range"""
+        self.action_processor.delay_range = self.get_delay_range()
+        
+    async def apply_fleet_layout(self, changed: Dict[str, Any]):
+        """Resize the fleet and rebuild cohorts after a reload"""
+        if 'num_bots' in changed:
+            await self.resize_fleet(self.config.num_bots)
+        self.action_processor.cohorts = self.build_cohorts()
+        
+    def find_bot(self, bot_id: int) -> Optional[int]:
+        """Get the current position of a bot in the fleet lists"""
+        return next((i for i, page in enumerate(self.pages) if page._bot_id == bot_id), None)
+        
+    async def resize_fleet(self, num_bots: int):
+        """Launch or close bots so the fleet has bots 1..num_bots"""
+        async with self.fleet_lock:
+            for bot_id in range(1, num_bots + 1):
+                if self.find_bot(bot_id) is None:
+                    await self.launch_bot(bot_id - 1)
+                    
+            extra = sorted((page._bot_id for page in self.pages if page._bot_id > num_bots), reverse=True)
+            for bot_id in extra:
+                index = self.find_bot(bot_id)
+                if index is None:
+                    continue
+                # Leave the fleet before closing so the lists stay in step
+                context = self.contexts.pop(index)
+                del self.pages[index]
+                await context.close()
+                self.logger.info(f"Bot {bot_id} closed")
+                
+    async def recycle_bot(self, bot_id: int, page: Optional[Page] = None) -> bool:
+        """Close a bot and reopen it from its profile at its current URL
+        
+        With `page`, the bot is only recycled while that is still its page.
+        Returns whether a fresh bot took its place.
+        """
+        async with self.fleet_lock:
+            index = self.find_bot(bot_id)
+            if index is None or (page is not None and self.pages[index] is not page):
+                return False  # Closed or recycled meanwhile, e.g. by a fleet resize
+                
+            url = self.pages[index].url
+            
+            # Leave the fleet while down so nothing is dispatched to a closed page.
+            # Persistent contexts flush cookies and storage to the profile on close
+            context = self.contexts.pop(index)
+            del self.pages[index]
+            try:
+                await context.close()
+            except Exception as e:
+                self.logger.warning(f"Bot {bot_id} did not close cleanly: {e}")
+                
+            for _ in range(RECYCLE_ATTEMPTS):
+                if await self.launch_bot(bot_id - 1):
+                    break
+            else:
+                self.logger.error(
+                    f"Bot {bot_id} lost: relaunch failed {RECYCLE_ATTEMPTS} times, "
+                    f"it returns with the next change to num_bots or a restart"
+                )
+                return False
+            page = self.pages[self.find_bot(bot_id)]
+            
+        if url and url != 'about:blank':
+            try:
+                await page.goto(url, wait_until='domcontentloaded')
+            except Exception as e:
+                # The bot itself is back, just not where it was
+                self.logger.error(f"Failed to restore bot {bot_id} to {url}: {e}")
+        self.logger.info(f"Bot {bot_id} recycled")
+        return True
+        
+    @staticmethod
+    def get_ws_origin(websocket) -> Optional[str]:
+        """Get the Origin header of a WebSocket handshake, if any"""
+        request = getattr(websocket, 'request', None)
+        if request is not None:
+            headers = request.headers
+        else:
+            headers = websocket.request_headers  # websockets < 13
+        return headers.get('Origin')
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get runtime metrics for the bot fleet"""
+        metrics = {'bots': len(self.pages)}
+        if hasattr(self, 'action_processor'):
+            metrics.update(self.action_processor.get_metrics())
+            metrics['transport'] = self.transport_stats.to_dict()
+        metrics['resources'] = self.resource_monitor.get_metrics()
+        metrics['startup'] = self.startup.to_dict()
+        return metrics
+        
+    async def log_metrics(self):
+        """Log fleet metrics every `metrics_log_interval` seconds (0 disables)"""
+        while self.is_running:
+            interval = self.config.metrics_log_interval
+            # While disabled, keep polling so a hot-reloaded interval takes effect
+            await asyncio.sleep(interval if interval > 0 else 5)
+            if interval > 0:
+                self.logger.info(f"Metrics: {json.dumps(self.get_metrics())}")
+                
     async def stop(self):
         """Stop the automation engine"""
         self.is_running = False
+        for task_name in ('monitor_task', 'config_task', 'metrics_task'):
+            if hasattr(self, task_name):
+                getattr(self, task_name).cancel()
+                
         if hasattr(self, 'server'):
             self.server.close()
             await self.server.wait_closed()
             
-        for context in self.contexts:
-            await context.close()
+        async with self.fleet_lock:
+            for context in self.contexts:
+                await context.close()
             
         if self.playwright:
             await self.playwright.stop()
\ No newline at end of file
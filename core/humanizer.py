@@ -1,10 +1,16 @@
 # core/humanizer.py
 """Human-like input behavior simulation"""
 
+from __future__ import annotations
+
 import random
 import asyncio
-from typing import Dict, List, Tuple
-from playwright.async_api import Page
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from .profiler import timed
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class Humanizer:
     """Simulate human-like behavior for inputs"""
@@ -41,6 +47,7 @@ class Humanizer:
             {"wpm": 100, "accuracy": 0.995, "mistake_chance": 0.01}
         ]
         
+    @timed
     async def human_click(self, page: Page, selector: str):
         """Simulate human-like click with mouse movement"""
         # Get element position
@@ -85,6 +92,7 @@ class Humanizer:
         click_y = target_y + random.randint(-5, 5)
         await page.mouse.click(click_x, click_y)
         
+    @timed
     async def human_type(self, page: Page, selector: str, text: str):
         """Simulate human-like typing"""
         profile = random.choice(self.typing_profiles)
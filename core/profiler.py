@@ -0,0 +1,137 @@
+# core/profiler.py
+"""Opt-in sampling profiler, slow-callback reporting and coroutine timing"""
+
+import sys
+import time
+import asyncio
+import logging
+import functools
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+# The running profiler, if any; `timed` costs a single lookup while this is None
+_active: Optional['Profiler'] = None
+_call_path: ContextVar[Tuple[str, ...]] = ContextVar('chrommin_call_path', default=())
+
+def timed(func):
+    """Attribute the wall time of a coroutine to its call path while profiling"""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return await func(*args, **kwargs)
+
+        path = _call_path.get() + (name,)
+        token = _call_path.set(path)
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            profiler.record_wall(path, time.perf_counter() - started)
+            _call_path.reset(token)
+
+    return wrapper
+
+class SlowCallbackHandler(logging.Handler):
+    """Collect the slow-callback warnings asyncio logs in debug mode"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.records: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith('Executing'):
+            self.records.append(f"{datetime.fromtimestamp(record.created).isoformat()} {message}")
+
+class Profiler:
+    """Sample engine stacks and time coroutines, writing flamegraph folded files"""
+
+    def __init__(self, output_dir: str, interval_ms: float, slow_callback_ms: float):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.interval = interval_ms / 1000
+        self.slow_callback_threshold = slow_callback_ms / 1000
+        self.stack_samples: Counter = Counter()
+        self.wall_times: Counter = Counter()
+        self.slow_callbacks = SlowCallbackHandler()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start sampling and enable asyncio slow-callback reporting"""
+        global _active
+        self._loop = loop
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback_threshold
+        logging.getLogger('asyncio').addHandler(self.slow_callbacks)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='chrommin-profiler', daemon=True)
+        self._thread.start()
+        _active = self
+        self.logger.info(f"Profiling enabled, writing to {self.output_dir}")
+
+    def stop(self):
+        """Stop sampling and restore the event loop settings"""
+        global _active
+        _active = None
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        logging.getLogger('asyncio').removeHandler(self.slow_callbacks)
+        if self._loop:
+            self._loop.set_debug(False)
+
+    def _sample_loop(self):
+        """Record the stack of every other thread at a fixed interval"""
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stack_samples[';'.join(reversed(stack))] += 1
+
+    def record_wall(self, path: Tuple[str, ...], seconds: float):
+        """Add wall time spent in a timed coroutine"""
+        self.wall_times[path] += seconds
+
+    def dump(self) -> Path:
+        """Write everything collected so far and return the output directory"""
+        out = self.output_dir / datetime.now().strftime('%Y%m%d-%H%M%S')
+        out.mkdir(parents=True, exist_ok=True)
+
+        with open(out / 'cpu.folded', 'w') as f:
+            for stack, count in self.stack_samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        # Folded files carry self time; children running concurrently can
+        # add up to more than their parent, in which case self time is zero
+        children = Counter()
+        for path, seconds in self.wall_times.items():
+            if len(path) > 1:
+                children[path[:-1]] += seconds
+        with open(out / 'wall.folded', 'w') as f:
+            for path, seconds in self.wall_times.items():
+                self_us = max(0, int((seconds - children[path]) * 1e6))
+                f.write(f"{';'.join(path)} {self_us}\n")
+
+        with open(out / 'slow_callbacks.log', 'w') as f:
+            f.writelines(f"{line}\n" for line in self.slow_callbacks.records)
+
+        self.logger.info(f"Profile written to {out}")
+        return out
@@ -0,0 +1,152 @@
+# core/resource_monitor.py
+"""Sample per-bot resource usage and enforce memory budgets"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Set, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, CDPSession
+
+class ResourceMonitor:
+    """Sample bots through CDP Performance metrics and recycle those over budget"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.logger = logging.getLogger(__name__)
+        self.samples: Dict[int, Dict[str, Any]] = {}
+        self.recycled = 0
+        self.crashed = 0
+        self._recoveries: Set[asyncio.Task] = set()
+        self._sessions: Dict[int, Tuple[Page, CDPSession]] = {}
+        self._last_cpu: Dict[int, Tuple[float, float]] = {}
+
+    async def run(self):
+        """Sample and enforce budgets until the engine stops"""
+        while self.engine.is_running:
+            await asyncio.sleep(self.engine.config.resource_sample_interval)
+            try:
+                await self.sample_all()
+                await self.enforce_budgets()
+            except Exception as e:
+                self.logger.error(f"Resource sampling failed: {e}")
+
+    def watch(self, page: Page):
+        """Recycle a bot as soon as its renderer crashes"""
+        # The per-bot heap cap kills runaway renderers, and a crashed page
+        # never recovers on its own
+        page.on('crash', lambda _: self.on_crash(page))
+
+    def on_crash(self, page: Page):
+        """Schedule a crashed bot to be recycled"""
+        if not self.engine.is_running:
+            return
+        self.logger.warning(f"Bot {page._bot_id} crashed, recycling")
+        self.crashed += 1
+        task = asyncio.create_task(self.recover(page))
+        self._recoveries.add(task)
+        task.add_done_callback(self._recoveries.discard)
+
+    async def recover(self, page: Page):
+        """Recycle a crashed bot unless it was closed or recycled meanwhile"""
+        if await self.engine.recycle_bot(page._bot_id, page):
+            self.recycled += 1
+            self.samples.pop(page._bot_id, None)
+
+    async def get_session(self, page: Page) -> CDPSession:
+        """Get a CDP session with the Performance domain enabled for a page"""
+        bot_id = page._bot_id
+        cached = self._sessions.get(bot_id)
+        if cached and cached[0] is page:
+            return cached[1]
+
+        # New or recycled page: start from a fresh CPU baseline
+        session = await page.context.new_cdp_session(page)
+        await session.send('Performance.enable')
+        self._sessions[bot_id] = (page, session)
+        self._last_cpu.pop(bot_id, None)
+        return session
+
+    async def sample(self, page: Page) -> Dict[str, Any]:
+        """Sample JS heap size and CPU usage of a single bot"""
+        bot_id = page._bot_id
+        session = await self.get_session(page)
+        result = await session.send('Performance.getMetrics')
+        metrics = {m['name']: m['value'] for m in result['metrics']}
+
+        # TaskDuration is cumulative busy time, so CPU is its rate of change
+        task_duration = metrics.get('TaskDuration', 0.0)
+        timestamp = metrics.get('Timestamp', 0.0)
+        cpu_percent = 0.0
+        previous = self._last_cpu.get(bot_id)
+        if previous and timestamp > previous[1]:
+            cpu_percent = 100 * (task_duration - previous[0]) / (timestamp - previous[1])
+        self._last_cpu[bot_id] = (task_duration, timestamp)
+
+        return {
+            'memory_mb': metrics.get('JSHeapTotalSize', 0) / (1024 * 1024),
+            'cpu_percent': cpu_percent,
+            'nodes': int(metrics.get('Nodes', 0)),
+            'url': page.url
+        }
+
+    async def sample_all(self):
+        """Sample every bot concurrently"""
+        pages = list(self.engine.pages)
+
+        # Forget sessions and CPU baselines of bots that were closed
+        running = {page._bot_id for page in pages}
+        for bot_id in set(self._sessions) - running:
+            del self._sessions[bot_id]
+        for bot_id in set(self._last_cpu) - running:
+            del self._last_cpu[bot_id]
+
+        results = await asyncio.gather(*(self.sample(page) for page in pages), return_exceptions=True)
+
+        samples = {}
+        for page, result in zip(pages, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Could not sample bot {page._bot_id}: {result}")
+                continue
+            samples[page._bot_id] = result
+        self.samples = samples
+
+    async def enforce_budgets(self):
+        """Recycle bots over the per-bot budget, then the largest ones while the fleet is over"""
+        config = self.engine.config
+        bot_budget = config.bot_memory_budget_mb
+        fleet_budget = config.fleet_memory_budget_mb
+
+        to_recycle = []
+        if bot_budget:
+            to_recycle = [bot_id for bot_id, s in self.samples.items() if s['memory_mb'] > bot_budget]
+
+        if fleet_budget:
+            # Assume a recycled bot comes back close to empty
+            remaining = {bot_id: s['memory_mb'] for bot_id, s in self.samples.items() if bot_id not in to_recycle}
+            total = sum(remaining.values())
+            for bot_id in sorted(remaining, key=remaining.get, reverse=True):
+                if total <= fleet_budget:
+                    break
+                to_recycle.append(bot_id)
+                total -= remaining[bot_id]
+
+        for bot_id in to_recycle:
+            self.logger.warning(
+                f"Recycling bot {bot_id} ({self.samples[bot_id]['memory_mb']:.0f} MB) to stay within memory budget"
+            )
+            # Either way the sample no longer describes a running bot
+            if await self.engine.recycle_bot(bot_id):
+                self.recycled += 1
+            self.samples.pop(bot_id, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get the latest samples and recycle count"""
+        return {
+            'bots': self.samples,
+            'fleet_memory_mb': sum(s['memory_mb'] for s in self.samples.values()),
+            'recycled': self.recycled,
+            'crashed': self.crashed
+        }
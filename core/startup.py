@@ -0,0 +1,53 @@
+# core/startup.py
+"""Measure where startup time goes"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Any, Optional
+
+class StartupReport:
+    """Record the duration of each startup phase and the time to the first ready bot"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.first_ready: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a named phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def mark_ready(self):
+        """Record the first bot becoming ready"""
+        if self.first_ready is None:
+            self.first_ready = time.perf_counter() - self.started_at
+
+    def within_budget(self, budget: float) -> bool:
+        """Check that a bot became ready within `budget` seconds of process start"""
+        return self.first_ready is not None and self.first_ready <= budget
+
+    def format(self, budget: float) -> str:
+        """Format the breakdown as a plain-text table"""
+        lines = ["Startup report", "=============="]
+        for name, seconds in self.phases:
+            lines.append(f"{name:<30}{seconds * 1000:>10.1f} ms")
+
+        if self.first_ready is None:
+            lines.append(f"{'first ready bot':<30}{'never':>13}")
+        else:
+            lines.append(f"{'first ready bot':<30}{self.first_ready * 1000:>10.1f} ms")
+        status = "OK" if self.within_budget(budget) else "OVER BUDGET"
+        lines.append(f"{'budget':<30}{budget * 1000:>10.1f} ms  {status}")
+        return '\n'.join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export phases in seconds"""
+        return {
+            'phases': dict(self.phases),
+            'first_ready_seconds': self.first_ready
+        }
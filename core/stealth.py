@@ -1,8 +1,13 @@
 # core/stealth.py
 """Advanced stealth techniques for browser automation"""
 
+from __future__ import annotations
+
 import asyncio
-from playwright.async_api import BrowserContext
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
 
 async def stealth_async(context: BrowserContext):
     """Apply stealth techniques to a browser context"""
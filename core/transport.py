@@ -0,0 +1,118 @@
+# core/transport.py
+"""Decode batched action messages sent by the capture script"""
+
+import json
+import time
+from typing import Dict, List, Any, Union
+
+# Entries per intern table before the capture script starts over with a
+# reset marker, so long-lived pages with changing text don't grow forever
+INTERN_LIMIT = 1024
+
+# A single batch may push a table past the limit before the next reset;
+# anything beyond this is a misbehaving client
+INTERN_HARD_LIMIT = 4 * INTERN_LIMIT
+
+class TransportStats:
+    """Track wire size and parse cost of captured actions"""
+
+    def __init__(self):
+        self.messages = 0
+        self.actions = 0
+        self.bytes = 0
+        # JSON parsing and intern-table expansion are tracked apart, since
+        # batching lowers the former and adds the latter
+        self.parse_seconds = 0.0
+        self.expand_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export totals and per-action averages"""
+        per_action = max(self.actions, 1)
+        return {
+            'messages': self.messages,
+            'actions': self.actions,
+            'bytes': self.bytes,
+            'bytes_per_action': self.bytes / per_action,
+            'parse_us_per_action': self.parse_seconds * 1e6 / per_action,
+            'expand_us_per_action': self.expand_seconds * 1e6 / per_action
+        }
+
+class BatchDecoder:
+    """Expand batched messages from one WebSocket connection into actions
+
+    The capture script flushes once per animation frame and interns repeated
+    strings, so a batch looks like::
+
+        {"b": botId, "ts": baseTs, "s": [new strings], "l": [new selector lists],
+         "e": [{"t": type, "dt": offset, "sl": listIdx, "tx": strIdx, ...}]}
+
+    New strings and selector lists (arrays of string indices) are appended to
+    tables that live as long as the connection, which is why a decoder must not
+    be shared between connections. Once a table reaches `INTERN_LIMIT` the
+    script sends `"r": 1`, and both sides empty their tables before applying
+    the batch. Plain single-action messages are still accepted.
+    """
+
+    def __init__(self, stats: TransportStats):
+        self.stats = stats
+        self.strings: List[str] = []
+        self.selector_lists: List[List[str]] = []
+
+    def decode(self, message: Union[str, bytes]) -> List[Dict[str, Any]]:
+        """Decode a message into actions in the legacy dict format"""
+        started = time.perf_counter()
+        data = json.loads(message)
+        parsed = time.perf_counter()
+
+        if 'e' in data:
+            actions = self.expand_batch(data)
+        else:
+            actions = [data]
+
+        self.stats.messages += 1
+        self.stats.actions += len(actions)
+        # Count bytes on the wire, not characters
+        if isinstance(message, str) and not message.isascii():
+            self.stats.bytes += len(message.encode())
+        else:
+            self.stats.bytes += len(message)
+        self.stats.parse_seconds += parsed - started
+        self.stats.expand_seconds += time.perf_counter() - parsed
+        return actions
+
+    def expand_batch(self, batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update the intern tables and expand every event in a batch"""
+        strings = self.strings
+        if batch.get('r'):
+            strings.clear()
+            self.selector_lists.clear()
+
+        new_strings = batch.get('s', ())
+        new_lists = batch.get('l', ())
+        if (len(strings) + len(new_strings) > INTERN_HARD_LIMIT
+                or len(self.selector_lists) + len(new_lists) > INTERN_HARD_LIMIT):
+            raise ValueError("Intern table overflow, client never sent a reset")
+
+        strings.extend(new_strings)
+        for indices in new_lists:
+            self.selector_lists.append([strings[i] for i in indices])
+
+        bot_id = batch.get('b')
+        base_ts = batch.get('ts', 0)
+        selector_lists = self.selector_lists
+        actions = batch['e']
+
+        # Events were freshly parsed for this batch, so expand them in place
+        for action in actions:
+            action['botId'] = bot_id
+            action['ts'] = base_ts + action.pop('dt', 0)
+            list_index = action.pop('sl', None)
+            if list_index is not None:
+                action['selectors'] = selector_lists[list_index]
+            text_index = action.pop('tx', None)
+            if text_index is not None:
+                action['text'] = strings[text_index]
+            if 'intent' not in action:
+                action['intent'] = action['t']
+
+        return actions
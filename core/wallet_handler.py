@@ -1,10 +1,14 @@
 # core/wallet_handler.py
 """Handle wallet interactions and popups"""
 
+from __future__ import annotations
+
 import asyncio
 import logging
-from typing import Dict, List
-from playwright.async_api import Page
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 class WalletHandler:
     """Handle wallet interactions and transactions"""
@@ -14,10 +14,14 @@ Enhanced version with:
 
 import os
 import sys
+import time
 import asyncio
 import logging
 from pathlib import Path
 
+# Reference point for the startup report
+STARTED_AT = time.perf_counter()
+
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -33,7 +37,22 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-async def main():
+async def run_engine(startup_report: bool = False) -> int:
+    """Run the automation engine, or only measure its startup"""
+    # Heavy modules are imported only on the path that runs the engine
+    from core.startup import StartupReport
+    startup = StartupReport(STARTED_AT)
+    with startup.phase('import engine'):
+        from core.engine import AutomationEngine
+        
+    engine = AutomationEngine(startup)
+    if startup_report:
+        return 0 if await engine.run_startup_report() else 1
+        
+    await engine.start()
+    return 0
+
+def main() -> int:
     """Main application entry point"""
     logger = setup_logging()
     logger.info("Starting Chrommin...")
@@ -45,9 +64,7 @@ async def main():
             app = ChromminApp()
             app.run()
         else:
-            from core.engine import AutomationEngine
-            engine = AutomationEngine()
-            await engine.start()
+            return asyncio.run(run_engine('--startup-report' in sys.argv))
             
     except Exception as e:
         logger.error(f"Failed to start Chrommin: {e}")
@@ -67,4 +84,4 @@ if __name__ == "__main__":
         from utils.installer import install_chrommin
         install_chrommin()
     else:
-        asyncio.run(main())
\ No newline at end of file
+        sys.exit(main())
\ No newline at end of file